@@ -17,6 +17,10 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    install_requires=["requests", "aiohttp", "websockets"],
+    install_requires=["requests", "loguru"],
+    extras_require={
+        "async": ["aiohttp", "websockets"],
+        "columnar": ["numpy"],
+    },
     zip_safe=True,
 )
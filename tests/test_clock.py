@@ -0,0 +1,47 @@
+import time
+
+from woox.clock import ClockSync
+
+
+class _Response:
+    def __init__(self, ts):
+        self._ts = ts
+        self.headers = {}
+
+    def json(self):
+        return {"success": True, "timestamp": self._ts}
+
+
+class _Session:
+    def __init__(self, skew_ms, delays):
+        self.skew_ms = skew_ms
+        self.delays = list(delays)
+
+    def get(self, url, timeout=None):
+        delay = self.delays.pop(0)
+        time.sleep(delay / 2)
+        ts = time.time() * 1000 + self.skew_ms
+        time.sleep(delay / 2)
+        return _Response(ts)
+
+
+def test_clock_sync_uses_lowest_rtt_sample():
+    clock = ClockSync(_Session(5000, [0.05, 0.002, 0.03]), "url")
+    for _ in range(3):
+        clock.sync()
+
+    metrics = clock.metrics()
+    assert metrics["samples"] == 3
+    assert metrics["rtt_ms"] < 20
+    assert abs(clock.offset_ms - 5000) < 10
+    assert abs(clock.now_ms() - (time.time() * 1000 + 5000)) < 20
+
+
+def test_clock_sync_failure_keeps_offset():
+    class _Broken:
+        def get(self, url, timeout=None):
+            raise ConnectionError("down")
+
+    clock = ClockSync(_Broken(), "url")
+    assert clock.sync() is None
+    assert clock.offset_ms == 0 and clock.failures == 1
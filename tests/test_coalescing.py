@@ -0,0 +1,91 @@
+import threading
+import time
+
+from woox.coalescing import Hedger, SingleFlight
+
+
+def test_single_flight_shares_call():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(1)
+        return {"success": True}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"success": True}] * 5
+    assert flight.in_flight() == 0
+
+
+def test_hedger_fires_backup_for_slow_call():
+    hedger = Hedger(min_samples=5, min_delay=0.01)
+    for _ in range(5):
+        hedger.run(lambda: None)
+
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    assert hedger.run(flaky) == "fast"
+    assert hedger.hedged == 1
+    hedger.close()
+
+
+def test_hedger_never_queues_behind_busy_workers():
+    hedger = Hedger(min_samples=5, min_delay=0.01, max_workers=2)
+    for _ in range(5):
+        hedger.run(lambda: None)
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(hedger.run(lambda: time.sleep(0.2)))
+        )
+        for _ in range(8)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 8
+    assert elapsed < 0.4
+    assert hedger.hedged == 0
+    hedger.close()
+
+
+def test_hedger_tracks_latency_per_endpoint():
+    hedger = Hedger(min_samples=5, min_delay=0.01)
+    for _ in range(50):
+        hedger.run(lambda: None, "public/system_info")
+    for _ in range(5):
+        hedger.run(lambda: time.sleep(0.1), "public/market_trades")
+
+    assert hedger.run(lambda: time.sleep(0.05), "public/market_trades") is None
+    assert hedger.hedged == 0
+    assert hedger.delay("public/market_trades") >= 0.05
+    assert hedger.delay("public/system_info") == 0.01
+    hedger.close()
@@ -0,0 +1,139 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from woox.columnar import ColumnarRows
+
+ROWS = [
+    {"symbol": "SPOT_BTC_USDT", "side": "BUY", "price": 100, "quantity": 0.5},
+    {"symbol": "SPOT_ETH_USDT", "side": "SELL", "price": 10.5, "quantity": 1},
+    {"symbol": "SPOT_BTC_USDT", "side": None, "price": None, "quantity": 2},
+]
+
+
+def test_from_rows_builds_typed_columns():
+    cols = ColumnarRows.from_rows(ROWS)
+
+    assert len(cols) == 3
+    assert cols.categories["symbol"] == ["SPOT_BTC_USDT", "SPOT_ETH_USDT"]
+    assert cols["symbol"].tolist() == [0, 1, 0]
+    assert cols["side"].tolist() == [0, 1, -1]
+    assert cols["price"].dtype == np.float64
+    assert np.isnan(cols["price"][2])
+    assert cols.decode("side").tolist() == ["BUY", "SELL", None]
+
+
+def test_slice_shares_buffers():
+    cols = ColumnarRows.from_rows(ROWS)
+    head = cols[:2]
+
+    assert len(head) == 2
+    assert np.shares_memory(head["price"], cols["price"])
+    assert head.categories is cols.categories
+
+
+def test_to_pandas_and_arrow():
+    cols = ColumnarRows.from_rows(ROWS)
+
+    pytest.importorskip("pandas")
+    df = cols.to_pandas()
+    assert df["symbol"].tolist() == [
+        "SPOT_BTC_USDT",
+        "SPOT_ETH_USDT",
+        "SPOT_BTC_USDT",
+    ]
+
+    pytest.importorskip("pyarrow")
+    table = cols.to_arrow()
+    assert table.column("side").to_pylist() == ["BUY", "SELL", None]
+
+
+def test_as_columns_with_coalesced_requests():
+    import threading
+    import time
+
+    from woox import Client
+
+    release = threading.Event()
+    calls = []
+
+    class _Response:
+        status_code = 200
+
+        def json(self):
+            return {"success": True, "rows": [dict(row) for row in ROWS]}
+
+    class _Session:
+        def get(self, uri, **kwargs):
+            calls.append(uri)
+            release.wait(1)
+            return _Response()
+
+    client = Client("key", "secret", "app", True, coalesce=True)
+    client.session = _Session()
+
+    results = {}
+
+    def fetch(name, as_columns):
+        results[name] = client.get_orders(as_columns=as_columns)
+
+    threads = [
+        threading.Thread(target=fetch, args=("plain", False)),
+        threading.Thread(target=fetch, args=("cols1", True)),
+        threading.Thread(target=fetch, args=("cols2", True)),
+    ]
+    for t in threads:
+        t.start()
+    while client._single_flight.in_flight() == 0:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert isinstance(results["plain"]["rows"], list)
+    for name in ("cols1", "cols2"):
+        assert len(results[name]["rows"]) == 3
+        assert results[name]["rows"].names == list(ROWS[0])
+
+
+def test_from_rows_rejects_columnar_input():
+    cols = ColumnarRows.from_rows(ROWS)
+    with pytest.raises(TypeError):
+        ColumnarRows.from_rows(cols)
+
+
+def test_numeric_strings_and_high_cardinality_strings():
+    rows = [
+        {
+            "symbol": "SPOT_BTC_USDT",
+            "created_time": f"{1575014255 + i}.089",
+            "order_id": str(1000 + i),
+            "client_tag": f"tag-{i}",
+        }
+        for i in range(1000)
+    ]
+    rows[5]["created_time"] = None
+    cols = ColumnarRows.from_rows(rows)
+
+    assert cols["created_time"].dtype == np.float64
+    assert np.isnan(cols["created_time"][5])
+    assert cols["created_time"][0] == pytest.approx(1575014255.089)
+    assert cols["order_id"].dtype == np.int64
+    assert cols.categories["symbol"] == ["SPOT_BTC_USDT"]
+    assert "client_tag" not in cols.categories
+    assert cols["client_tag"].dtype == object
+
+
+def test_out_of_range_ints_and_id_strings():
+    cols = ColumnarRows.from_rows(
+        [
+            {"id": 2**63, "cid": "99999999999999999999", "tag": "007"},
+            {"id": 1, "cid": "1", "tag": "010"},
+        ]
+    )
+
+    assert cols["id"].dtype == object and cols["id"][0] == 2**63
+    assert list(cols.decode("cid")) == ["99999999999999999999", "1"]
+    assert list(cols.decode("tag")) == ["007", "010"]
@@ -0,0 +1,36 @@
+import gzip
+import zlib
+
+import pytest
+
+from woox.decoding import FrameDecoder
+
+
+def test_gzip_frames_from_memoryview():
+    decoder = FrameDecoder("gzip")
+    frame = gzip.compress(b'{"topic": "SPOT_BTC_USDT@orderbook", "ts": 1}')
+    assert decoder.decode(memoryview(frame)) == {
+        "topic": "SPOT_BTC_USDT@orderbook",
+        "ts": 1,
+    }
+    assert decoder.decode('{"event": "ping"}') == {"event": "ping"}
+
+
+def test_deflate_stream_reuses_decompressor():
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    frames = [
+        compressor.compress(msg) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        for msg in (b'{"id": 1}', b'{"id": 1}')
+    ]
+    decoder = FrameDecoder("deflate")
+    assert [decoder.decode(frame) for frame in frames] == [{"id": 1}] * 2
+
+
+def test_raw_mode_skips_json():
+    decoder = FrameDecoder("gzip", raw=True)
+    assert decoder.decode(gzip.compress(b'{"id": 1}')) == b'{"id": 1}'
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        FrameDecoder("brotli")
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ("aiohttp", "websockets", "loguru", "asyncio", "woox.streams")
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_client_import_skips_async_stack():
+    out = _run(
+        "import sys; from woox import Client; "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    )
+    assert out.stdout.strip() == "[]"
+
+
+def test_client_import_time_budget():
+    # -X importtime does not report modules loaded through the lazy
+    # woox.__getattr__, so time the statement users actually run. Best of
+    # three runs, to keep a cold disk cache from failing the test; pulling
+    # in aiohttp and websockets alone costs more than the budget's headroom.
+    code = (
+        "import time; t = time.perf_counter(); from woox import Client; "
+        "print(time.perf_counter() - t)"
+    )
+    elapsed = min(float(_run(code).stdout) for _ in range(3))
+    assert elapsed < 0.3
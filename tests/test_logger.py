@@ -0,0 +1,82 @@
+from woox.logger import DEBUG, INFO, StructuredLogger
+
+
+class _Recorder(StructuredLogger):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.records = []
+
+    def _write(self, record, depth=0):
+        self.records.append(record)
+
+
+class _NoRepr:
+    def __repr__(self):
+        raise AssertionError("formatted a disabled record")
+
+
+def test_disabled_level_does_no_work():
+    log = StructuredLogger(level=INFO)
+    assert not log.enabled(DEBUG)
+    log.event(DEBUG, "request", params=_NoRepr())
+    log.debug(_NoRepr())
+    assert log._logger is None
+
+
+def test_event_rate_limit_reports_dropped():
+    log = _Recorder(level=DEBUG)
+    log.limit("request", every=3)
+    for i in range(7):
+        log.event(DEBUG, "request", i=i)
+    assert [r[2]["i"] for r in log.records] == [2, 5]
+    assert [r[2]["dropped"] for r in log.records] == [2, 2]
+
+
+def test_async_sink_writes_on_background_thread():
+    log = _Recorder(level=DEBUG)
+    log.configure(async_sink=True)
+    for i in range(3):
+        log.event(INFO, "order_response", i=i)
+    log.close()
+    assert [r[2]["i"] for r in log.records] == [0, 1, 2]
+
+
+def _caller_records(async_sink):
+    from loguru import logger
+
+    records = []
+    sink = logger.add(lambda m: records.append(m.record), level="DEBUG")
+    log = StructuredLogger(level=DEBUG)
+    log.configure(async_sink=async_sink)
+    try:
+        log.info("plain")
+        log.log(INFO, "direct")
+        log.event(INFO, "order_response", i=1)
+        log.close()
+    finally:
+        logger.remove(sink)
+    return records
+
+
+def test_records_report_the_calling_site():
+    for async_sink in (False, True):
+        records = _caller_records(async_sink)
+        assert len(records) == 3
+        assert {r["function"] for r in records} == {"_caller_records"}
+        assert {r["name"] for r in records} == {__name__}
+        assert {r["file"].path for r in records} == {__file__}
+
+
+def test_async_sink_flushed_at_exit():
+    import subprocess
+    import sys
+
+    code = (
+        "from woox.logger import log; log.configure(async_sink=True); "
+        "[log.error('fatal {}', i) for i in range(3)]"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    messages = [line.rsplit(" - ", 1)[-1] for line in out.stderr.splitlines()]
+    assert messages == ["fatal 0", "fatal 1", "fatal 2"]
@@ -0,0 +1,38 @@
+import pytest
+
+from woox import AccountPool
+
+
+def test_accounts_share_session():
+    pool = AccountPool("app", testnet=True)
+    a = pool.add_account("a", "key-a", "secret-a")
+    b = pool.add_account("b", "key-b", "secret-b")
+
+    assert a.session is b.session is pool.session
+    assert a.API_KEY == "key-a" and b.API_SECRET == "secret-b"
+    assert len(pool) == 2 and list(pool) == ["a", "b"]
+
+    with pytest.raises(ValueError):
+        pool.add_account("a", "key", "secret")
+
+    pool.remove_account("a")
+    assert "a" not in pool
+    pool.close()
+
+
+def test_only_public_client_pings():
+    import threading
+
+    from woox.transport import TransportConfig
+
+    before = threading.active_count()
+    pool = AccountPool(
+        "app", testnet=True, transport=TransportConfig(idle_ping_interval=60)
+    )
+    for i in range(10):
+        pool.add_account(f"sub{i}", f"key{i}", f"secret{i}")
+
+    assert threading.active_count() - before == 1
+    assert pool.public._pinger is not None
+    assert all(pool[name]._pinger is None for name in pool)
+    pool.close()
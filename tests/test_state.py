@@ -0,0 +1,133 @@
+from woox.state import StreamState
+
+
+def test_snapshot_round_trip(tmp_path):
+    state = StreamState(max_bars=2)
+    state.record_subscription(
+        "market", {"topic": "SPOT_BTC_USDT@kline_1m", "event": "subscribe"}
+    )
+    state.update(
+        {
+            "topic": "SPOT_BTC_USDT@orderbook",
+            "ts": 1,
+            "data": {
+                "symbol": "SPOT_BTC_USDT",
+                "asks": [[101.0, 1.0], [102.0, 2.0]],
+                "bids": [[99.0, 3.0]],
+            },
+        }
+    )
+    state.update(
+        {
+            "topic": "SPOT_BTC_USDT@orderbookupdate",
+            "ts": 2,
+            "data": {
+                "symbol": "SPOT_BTC_USDT",
+                "prevTs": 1,
+                "asks": [[101.0, 0]],
+                "bids": [[98.0, 1.0]],
+            },
+        }
+    )
+    for start in (0, 60, 60, 120):
+        state.update(
+            {
+                "topic": "SPOT_BTC_USDT@kline_1m",
+                "ts": start,
+                "data": {"startTime": start, "close": start},
+            }
+        )
+    state.update(
+        {
+            "topic": "executionreport",
+            "ts": 5,
+            "data": {"orderId": 1, "status": "NEW"},
+        }
+    )
+    state.update(
+        {
+            "topic": "executionreport",
+            "ts": 6,
+            "data": {"orderId": 2, "status": "FILLED"},
+        }
+    )
+
+    path = str(tmp_path / "state.bin")
+    state.save(path)
+    restored = StreamState.load(path)
+
+    assert restored.books["SPOT_BTC_USDT"] == {
+        "asks": {102.0: 2.0},
+        "bids": {99.0: 3.0, 98.0: 1.0},
+    }
+    bars = restored.bars["SPOT_BTC_USDT@kline_1m"]
+    assert [bar["startTime"] for bar in bars] == [60, 120]
+    assert list(restored.orders) == ["1"]
+    assert restored.last_ts("executionreport") == 6
+    assert "SPOT_BTC_USDT@kline_1m" in restored.subscriptions["market"]
+
+
+def test_load_missing_snapshot(tmp_path):
+    state = StreamState.load(str(tmp_path / "missing.bin"))
+    assert state.books == {} and state.subscriptions == {}
+
+
+def test_restored_book_dropped_on_sequence_gap(tmp_path):
+    state = StreamState()
+    state.update(
+        {
+            "topic": "SPOT_BTC_USDT@orderbook",
+            "ts": 10,
+            "data": {"symbol": "SPOT_BTC_USDT", "asks": [[101.0, 1.0]]},
+        }
+    )
+    path = str(tmp_path / "state.bin")
+    state.save(path)
+    restored = StreamState.load(path)
+    assert restored.book_ts == {"SPOT_BTC_USDT": 10}
+
+    restored.update(
+        {
+            "topic": "SPOT_BTC_USDT@orderbookupdate",
+            "ts": 500,
+            "data": {
+                "symbol": "SPOT_BTC_USDT",
+                "prevTs": 400,
+                "asks": [[101.0, 0]],
+            },
+        }
+    )
+    assert "SPOT_BTC_USDT" not in restored.books
+
+
+def test_load_corrupt_snapshot(tmp_path):
+    path = tmp_path / "state.bin"
+    for blob in (b"garbage", b"WOOXSNP1garbage"):
+        path.write_bytes(blob)
+        assert StreamState.load(str(path)).books == {}
+
+
+def test_snapshotter_stop_waits_for_running_save(tmp_path):
+    import time
+
+    from woox.state import StateSnapshotter
+
+    class _SlowState(StreamState):
+        active = 0
+        overlapped = False
+
+        def save(self, path):
+            self.active += 1
+            self.overlapped |= self.active > 1
+            time.sleep(0.05)
+            super().save(path)
+            self.active -= 1
+
+    state = _SlowState()
+    snapshotter = StateSnapshotter(state, str(tmp_path / "s"), interval=0.01)
+    snapshotter.start()
+    time.sleep(0.03)
+    snapshotter.stop()
+    assert not snapshotter.is_alive()
+    assert not state.overlapped
+    assert StreamState.load(str(tmp_path / "s")).books == {}
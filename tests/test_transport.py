@@ -0,0 +1,34 @@
+import asyncio
+
+from woox import AsyncClient
+from woox.transport import TransportConfig
+
+
+class _CountingClient(AsyncClient):
+    pings = 0
+
+    async def warmup(self, connections=None):
+        self.pings += 1
+        return connections
+
+
+def test_async_client_pings_when_idle():
+    async def run():
+        client = _CountingClient(
+            None,
+            None,
+            "app",
+            testnet=True,
+            loop=asyncio.get_running_loop(),
+            transport=TransportConfig(idle_ping_interval=0.05),
+        )
+        await asyncio.sleep(0.2)
+        await client.close_connection()
+        pings = client.pings
+        await asyncio.sleep(0.1)
+        return pings, client.pings, client._pinger.cancelled()
+
+    pings, after_close, cancelled = asyncio.run(run())
+    assert pings >= 1
+    assert after_close == pings
+    assert cancelled
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from woox import Client
 from woox import ThreadedWebsocketManager
@@ -10,3 +12,123 @@ APPLICATION_ID = os.getenv("APPLICATION_ID")
 
 def test_create_TWM():
     wsm = ThreadedWebsocketManager(API, SECRET, APPLICATION_ID, False)
+
+
+class _FakeConnection:
+    def __init__(self, socket, frames):
+        self.socket = socket
+        self.frames = list(frames)
+
+    async def recv(self):
+        if not self.frames:
+            from woox.streams import WSListenerState
+
+            self.socket.ws_state = WSListenerState.EXITING
+            raise ConnectionError("closed")
+        return self.frames.pop(0)
+
+
+def _streaming_socket(frames, **kwargs):
+    from woox.streams import ReconnectingWebsocket, WSListenerState
+
+    loop = asyncio.get_running_loop()
+    socket = ReconnectingWebsocket(loop, "ws://test", name="test", **kwargs)
+    socket.ws = _FakeConnection(socket, frames)
+    socket.ws_state = WSListenerState.STREAMING
+    return socket
+
+
+def test_read_loop_batches_queued_messages():
+    async def run():
+        socket = _streaming_socket(['{"id": 1}', "not json", '{"id": 2}'])
+        await socket._read_loop()
+        assert socket._watchdog is None
+        return await socket.recv_batch()
+
+    assert asyncio.run(run()) == [{"id": 1}, {"id": 2}]
+
+
+def test_read_loop_direct_callback_skips_queue():
+    received = []
+
+    async def run():
+        socket = _streaming_socket(
+            ['{"id": 1}', '{"id": 2}'], callback=received.append
+        )
+        await socket._read_loop()
+        return socket._queue.qsize()
+
+    assert asyncio.run(run()) == 0
+    assert received == [{"id": 1}, {"id": 2}]
+
+
+def test_control_frames_jump_the_send_queue():
+    from woox.streams import PONG_FRAME, PRIORITY_CONTROL
+
+    class _Recorder:
+        def __init__(self):
+            self.sent = []
+
+        async def send(self, frame):
+            self.sent.append(frame)
+
+    async def run():
+        socket = _streaming_socket([])
+        socket.ws = _Recorder()
+        socket.send_many(['{"topic":"a"}', '{"topic":"b"}'])
+        socket.send_nowait(PONG_FRAME, PRIORITY_CONTROL)
+        socket._connected.set()
+        await asyncio.sleep(0.01)
+        socket._writer.cancel()
+        return socket.ws.sent
+
+    assert asyncio.run(run()) == [
+        PONG_FRAME,
+        '{"topic":"a"}',
+        '{"topic":"b"}',
+    ]
+
+
+def test_read_loop_survives_callback_errors():
+    received = []
+
+    def callback(msg):
+        if msg["id"] == 1:
+            raise KeyError("boom")
+        received.append(msg)
+
+    async def run():
+        socket = _streaming_socket(
+            ['{"id": 1}', '{"id": 2}'], callback=callback
+        )
+        await socket._read_loop()
+        return socket._watchdog
+
+    assert asyncio.run(run()) is None
+    assert received == [{"id": 2}]
+
+
+def test_get_socket_passes_compression():
+    import gzip
+    from types import SimpleNamespace
+
+    from woox.streams import wooxSocketManager
+
+    async def run():
+        client = SimpleNamespace(testnet=True, application_id="app")
+        bsm = wooxSocketManager(client, loop=asyncio.get_running_loop())
+        socket = bsm.get_socket("market", compression="gzip")
+        return socket._handle_message(gzip.compress(b'{"id": 1}'))
+
+    assert asyncio.run(run()) == {"id": 1}
+
+
+def test_raw_ping_matches_event_only():
+    from woox.threaded_stream import ThreadedApiManager
+
+    is_ping = ThreadedApiManager._is_ping
+    assert is_ping('{"event": "ping", "ts": 1}')
+    assert is_ping(b'{"event":"ping"}')
+    assert is_ping(memoryview(b'{"event" :  "ping"}'))
+    assert not is_ping('{"id": "ping", "event": "subscribe"}')
+    assert not is_ping(b'{"topic": "t", "data": {"note": "ping"}}')
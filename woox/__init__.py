@@ -3,6 +3,33 @@ from woox.exceptions import wooxValueError
 
 from woox.authentication import signature
 
-from woox.client import Client
-from woox.client import AsyncClient
-from woox.streams import ThreadedWebsocketManager
+# The REST client, websocket stack and account pool are imported on first
+# use, so ``from woox import Client`` does not pay for aiohttp/websockets.
+_LAZY_ATTRS = {
+    "Client": "woox.client",
+    "AsyncClient": "woox.client",
+    "ThreadedWebsocketManager": "woox.streams",
+    "AccountPool": "woox.pool",
+}
+
+__all__ = [
+    "wooxAPIException",
+    "wooxValueError",
+    "signature",
+    *_LAZY_ATTRS,
+]
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'woox' has no attribute '{name}'")
+    import importlib
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
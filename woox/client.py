@@ -1,14 +1,18 @@
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
-import aiohttp
-import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+import threading
 import time
-from woox import signature
-import datetime
+from woox.authentication import signature
+from woox.clock import ClockSync
+from woox.coalescing import Hedger, SingleFlight
+from woox.transport import IdlePinger, TransportConfig
 import json
+from woox.logger import DEBUG, log
 
-from loguru import logger as log
+if TYPE_CHECKING:
+    import aiohttp
 
 
 class BaseClient:
@@ -24,6 +28,9 @@ class BaseClient:
         secret: Optional[str] = None,
         application_id: str = "",
         testnet: bool = False,
+        transport: Optional[TransportConfig] = None,
+        session=None,
+        clock: Optional[ClockSync] = None,
     ):
         self.API_KEY = api
         self.API_SECRET = secret
@@ -31,10 +38,20 @@ class BaseClient:
             raise Exception("NoApplicationIdError")
         self.application_id = application_id
         self.testnet = testnet
-        self.session = self._init_session()
+        self.transport = transport or TransportConfig()
+        self._owns_session = session is None
+        self.session = session if session is not None else self._init_session()
+        self.clock = clock
+        self._owns_clock = False
         self.header = {}
         self._init_url(application_id)
         self.TIMEOUT = 45
+        self._last_used = time.monotonic()
+
+    def _timestamp(self) -> int:
+        if self.clock:
+            return self.clock.now_ms()
+        return round(time.time() * 1000)
 
     def _get_header(self) -> Dict:
         header = {
@@ -61,6 +78,13 @@ class BaseClient:
 
         self.ws_url.format(application_id)
 
+    def _create_api_uri(self, ep: str, v: str = ""):
+        if not v:
+            v = self.API_VERSION
+        else:
+            v = v
+        return self.api_url + "/" + v + "/" + ep
+
     def _handle_response(self, response: requests.Response):
         code = response.status_code
         if code == 200:
@@ -77,35 +101,113 @@ class Client(BaseClient):
         secret: Optional[str],
         application_id: str,
         testnet: bool,
+        coalesce: bool = False,
+        hedge: bool = False,
+        transport: Optional[TransportConfig] = None,
+        session: Optional[requests.Session] = None,
+        clock: Optional[ClockSync] = None,
     ):
         super().__init__(
             api=api,
             secret=secret,
             application_id=application_id,
             testnet=testnet,
+            transport=transport,
+            session=session,
+            clock=clock,
         )
+        self._single_flight = SingleFlight() if coalesce else None
+        self._hedger = Hedger() if hedge else None
+        self._pinger = None
+        if self.transport.idle_ping_interval:
+            self._pinger = IdlePinger(self, self.transport.idle_ping_interval)
+            self._pinger.start()
 
     def _init_session(self) -> requests.Session:
         self.header = self._get_header()
         session = requests.session()
+        adapter = HTTPAdapter(
+            pool_connections=self.transport.pool_connections,
+            pool_maxsize=self.transport.pool_maxsize,
+            pool_block=self.transport.pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
         session.headers.update(self.header)
+        if not self.transport.keepalive:
+            session.headers["Connection"] = "close"
         return session
 
-    def _create_api_uri(self, ep: str, v: str = ""):
-        if not v:
-            v = self.API_VERSION
-        else:
-            v = v
-        return self.api_url + "/" + v + "/" + ep
+    def warmup(self, connections: Optional[int] = None) -> int:
+        """Open ``connections`` pooled sockets so the next call skips DNS, TCP
+        and TLS setup. Returns the number of successful warm-up requests."""
+        connections = connections or self.transport.warmup_connections
+        uri = self._create_api_uri(self.transport.warmup_endpoint)
+        opened = []
+
+        def _open():
+            try:
+                self.session.get(uri, timeout=self.TIMEOUT).close()
+                opened.append(1)
+            except requests.RequestException as e:
+                log.warning(f"warmup request failed: {e}")
+
+        # Concurrent requests force the pool to hold distinct sockets.
+        workers = [threading.Thread(target=_open) for _ in range(connections)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self._last_used = time.monotonic()
+        return len(opened)
+
+    def sync_clock(self, interval: float = 60) -> ClockSync:
+        """Start tracking the server clock; signed requests then use it."""
+        if self._owns_clock:
+            self.clock.stop()
+        clock = ClockSync(
+            self.session,
+            self._create_api_uri("public/system_info"),
+            interval=interval,
+        )
+        clock.sync()
+        clock.start()
+        self.clock = clock
+        self._owns_clock = True
+        return clock
+
+    def close(self):
+        if self._owns_clock:
+            self.clock.stop()
+        if self._pinger:
+            self._pinger.stop()
+        if self._hedger:
+            self._hedger.close()
+        if self._owns_session:
+            self.session.close()
 
     def _request_api(
         self, method, ep: str, signed: bool, v: str = "", **kwargs
     ):
         uri = self._create_api_uri(ep, v)
+        self._last_used = time.monotonic()
         if v == "v3":
-            return self._v3_request(method, ep, uri, signed, **kwargs)
+            call = lambda: self._v3_request(method, ep, uri, signed, **kwargs)
         else:
-            return self._request(method, uri, signed, **kwargs)
+            call = lambda: self._request(method, uri, signed, **kwargs)
+
+        # Only read-only calls are shared or duplicated; hedging re-sends the
+        # request, so it is further limited to unsigned endpoints.
+        if method != "get":
+            return call()
+        if self._hedger and not signed:
+            unhedged = call
+            call = lambda: self._hedger.run(unhedged, uri)
+        if self._single_flight:
+            params = json.dumps(kwargs, sort_keys=True, default=str)
+            key = (uri, signed, params)
+            return self._single_flight.do(key, call)
+        return call()
 
     def _get(self, ep, signed=False, v: str = "", **kwargs):
         return self._request_api("get", ep, signed, v, **kwargs)
@@ -125,8 +227,9 @@ class Client(BaseClient):
         try:
             sorted_arg = {key: value for key, value in sorted(kwargs.items())}
             json_formatted_str = ""
+            header = None
             if signed:
-                ts = round(datetime.datetime.now().timestamp() * 1000)
+                ts = self._timestamp()
                 msg = str(ts) + f"{method.upper()}/v3/{ep}"
 
                 if sorted_arg != {}:
@@ -140,13 +243,12 @@ class Client(BaseClient):
                     "x-api-key": self.API_KEY,
                     "x-api-timestamp": str(ts),
                 }
-                self.session.headers.update(header)
 
             uri = (
                 uri + "?" + "&".join(f"{k}={v}" for k, v in sorted_arg.items())
             )
             self.response = getattr(self.session, method)(
-                uri, data=json_formatted_str
+                uri, data=json_formatted_str, headers=header
             )
 
             return self._handle_response(self.response)
@@ -158,10 +260,14 @@ class Client(BaseClient):
     def _request(self, method, uri: str, signed: bool, **kwargs):
         try:
             sorted_arg = {key: value for key, value in sorted(kwargs.items())}
-            log.info(sorted_arg)
+            if log.enabled(DEBUG):
+                log.event(
+                    DEBUG, "request", method=method, uri=uri, params=sorted_arg
+                )
+            header = None
             if signed:
                 msg = ""
-                ts = round(datetime.datetime.now().timestamp() * 1000)
+                ts = self._timestamp()
                 for key, value in sorted_arg.items():
                     if msg:
                         msg += "&"
@@ -175,31 +281,48 @@ class Client(BaseClient):
                     "x-api-key": self.API_KEY,
                     "x-api-timestamp": str(ts),
                 }
-                self.session.headers.update(header)
 
             self.response = getattr(self.session, method)(
-                uri, params=sorted_arg
+                uri, params=sorted_arg, headers=header
             )
             return self._handle_response(self.response)
         except Exception as e:
             log.error(f"[ERROR] Request failed!")
             log.error(e)
 
+    @staticmethod
+    def _to_columns(ret: Optional[Dict], *path: str) -> Optional[Dict]:
+        """Return a copy of ``ret`` with the rows at ``path`` as columns.
+
+        ``ret`` itself is left untouched: with ``coalesce=True`` the same
+        response dict is handed to every caller of the request.
+        """
+        from woox.columnar import ColumnarRows
+
+        key = path[0]
+        if not isinstance(ret, dict) or key not in ret:
+            return ret
+        if len(path) == 1:
+            return {**ret, key: ColumnarRows.from_rows(ret[key])}
+        return {**ret, key: Client._to_columns(ret[key], *path[1:])}
+
     def get_exchange_info(self, symbol: str) -> Dict:
         return self._get(f"public/info/{symbol}")
 
     def get_available_symbol(self) -> Dict:
         return self._get("public/info")
 
-    def get_market_trades(self, **params) -> Dict:
-        return self._get("public/market_trades", **params)
+    def get_market_trades(self, as_columns: bool = False, **params) -> Dict:
+        ret = self._get("public/market_trades", **params)
+        return self._to_columns(ret, "rows") if as_columns else ret
 
     def get_available_token(self) -> Dict:
         return self._get("public/token")
 
     def send_order(self, **params) -> Dict:
         ret = self._post("order", True, **params)
-        log.info(ret)
+        if log.enabled(DEBUG):
+            log.event(DEBUG, "order_response", response=ret)
         return ret
 
     def cancel_order(self, **params) -> Dict:
@@ -217,21 +340,21 @@ class Client(BaseClient):
     def get_order_by_client_order_id(self, oid) -> Dict:
         return self._get("client/order/{oid}", True)
 
-    def get_orders(self, **params) -> Dict:
-        return self._get("orders", True, **params)
+    def get_orders(self, as_columns: bool = False, **params) -> Dict:
+        ret = self._get("orders", True, **params)
+        return self._to_columns(ret, "rows") if as_columns else ret
 
-    def get_klines(self, **params) -> Dict:
-        return self._get("kline", True, **params)
+    def get_klines(self, as_columns: bool = False, **params) -> Dict:
+        ret = self._get("kline", True, **params)
+        return self._to_columns(ret, "rows") if as_columns else ret
 
-    def get_current_holding(self, **params) -> Dict:
-        return self._get("balances", True, "v3", **params)
+    def get_current_holding(self, as_columns: bool = False, **params) -> Dict:
+        ret = self._get("balances", True, "v3", **params)
+        return self._to_columns(ret, "data", "holding") if as_columns else ret
 
     def get_account_info(self) -> Dict:
         return self._get("accountinfo", True, "v3")
 
-    def get_market_trades(self, **params) -> Dict:
-        return self._get("public/market_trades", **params)
-
 
 class AsyncClient(BaseClient):
     def __init__(
@@ -241,14 +364,25 @@ class AsyncClient(BaseClient):
         application_id: str,
         testnet: bool,
         loop=None,
+        transport: Optional[TransportConfig] = None,
+        clock: Optional[ClockSync] = None,
     ):
+        import asyncio
+
         self.loop = loop or asyncio.get_event_loop()
         super().__init__(
             api=api,
             secret=secret,
             application_id=application_id,
             testnet=testnet,
+            transport=transport,
+            clock=clock,
         )
+        self._pinger = None
+        if self.transport.idle_ping_interval:
+            self._pinger = self.loop.create_task(
+                self._idle_ping(self.transport.idle_ping_interval)
+            )
 
     @classmethod
     async def create(
@@ -258,17 +392,72 @@ class AsyncClient(BaseClient):
         application_id: str,
         testnet: bool,
         loop=None,
+        transport: Optional[TransportConfig] = None,
+        clock: Optional[ClockSync] = None,
     ):
-        self = cls(api, secret, application_id, testnet, loop)
+        self = cls(
+            api, secret, application_id, testnet, loop, transport, clock
+        )
         return self
 
-    def _init_session(self) -> aiohttp.ClientSession:
+    def _init_session(self) -> "aiohttp.ClientSession":
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError(
+                "AsyncClient requires aiohttp: pip install python-woox[async]"
+            )
+
+        transport = self.transport
+        connector = aiohttp.TCPConnector(
+            limit=transport.pool_connections * transport.pool_maxsize,
+            limit_per_host=transport.pool_maxsize,
+            use_dns_cache=self.transport.dns_cache_ttl is not None,
+            ttl_dns_cache=self.transport.dns_cache_ttl,
+            keepalive_timeout=(
+                self.transport.keepalive_timeout
+                if self.transport.keepalive
+                else None
+            ),
+            force_close=not self.transport.keepalive,
+            loop=self.loop,
+        )
         session = aiohttp.ClientSession(
-            loop=self.loop, headers=self._get_header()
+            loop=self.loop, headers=self._get_header(), connector=connector
         )
         return session
 
+    async def warmup(self, connections: Optional[int] = None) -> int:
+        import asyncio
+        import aiohttp
+
+        connections = connections or self.transport.warmup_connections
+        uri = self._create_api_uri(self.transport.warmup_endpoint)
+
+        async def _open():
+            try:
+                async with self.session.get(uri) as response:
+                    await response.read()
+                return True
+            except aiohttp.ClientError as e:
+                log.warning(f"warmup request failed: {e}")
+                return False
+
+        opened = await asyncio.gather(*(_open() for _ in range(connections)))
+        self._last_used = time.monotonic()
+        return sum(opened)
+
+    async def _idle_ping(self, interval: float):
+        import asyncio
+
+        while True:
+            await asyncio.sleep(interval / 2)
+            if time.monotonic() - self._last_used >= interval:
+                await self.warmup(connections=1)
+
     async def close_connection(self):
+        if self._pinger:
+            self._pinger.cancel()
         if self.session:
             assert self.session
             await self.session.close()
@@ -276,7 +465,7 @@ class AsyncClient(BaseClient):
     async def _request(self, method, uri: str, signed: bool, **kwargs):
         sorted_arg = {key: value for key, value in sorted(kwargs.items())}
         if signed:
-            ts = str(int(time.time() * 1000))
+            ts = str(self._timestamp())
             sig = signature(ts, self.API_SECRET, **sorted_arg)
             self.header["x-api-signature"] = sig
             self.header["x-api-timestamp"] = ts
@@ -300,6 +489,7 @@ class AsyncClient(BaseClient):
         self, method, ep: str, signed: bool, v: str = "", **kwargs
     ):
         uri = self._create_api_uri(ep, v)
+        self._last_used = time.monotonic()
         return self._request(method, uri, signed, **kwargs)
 
     async def _get(self, ep, signed=False, v: str = "", **kwargs):
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from woox.logger import log
+
+
+class ClockSync(threading.Thread):
+    """Estimate the exchange clock offset for signature timestamps.
+
+    Each sample is NTP-style: the server timestamp is assumed to be taken
+    half-way through the round trip. The offset of the lowest-RTT sample in
+    the recent window is used, since it has the smallest error bound.
+    """
+
+    def __init__(
+        self,
+        session,
+        url: str,
+        interval: float = 60,
+        window: int = 8,
+        timeout: float = 5,
+    ):
+        super().__init__(daemon=True, name="woox-clock-sync")
+        self._session = session
+        self._url = url
+        self._interval = interval
+        self._timeout = timeout
+        self._samples = deque(maxlen=window)
+        self._stop_event = threading.Event()
+        self.offset_ms: float = 0.0
+        self.rtt_ms: Optional[float] = None
+        self.last_sync: Optional[float] = None
+        self.failures = 0
+
+    def now_ms(self) -> int:
+        return round(time.time() * 1000 + self.offset_ms)
+
+    @staticmethod
+    def _server_time_ms(response) -> float:
+        try:
+            ts = response.json().get("timestamp")
+        except ValueError:
+            ts = None
+        if ts:
+            return float(ts)
+        from email.utils import parsedate_to_datetime
+
+        return (
+            parsedate_to_datetime(response.headers["Date"]).timestamp() * 1000
+        )
+
+    def sync(self) -> Optional[Tuple[float, float]]:
+        try:
+            t0 = time.time()
+            response = self._session.get(self._url, timeout=self._timeout)
+            t1 = time.time()
+            server_ms = self._server_time_ms(response)
+        except Exception as e:
+            self.failures += 1
+            log.warning(f"clock sync failed: {e}")
+            return None
+
+        rtt_ms = (t1 - t0) * 1000
+        offset_ms = server_ms - (t0 + t1) / 2 * 1000
+        self._samples.append((rtt_ms, offset_ms))
+        self.rtt_ms, self.offset_ms = min(self._samples)
+        self.last_sync = t1
+        return offset_ms, rtt_ms
+
+    def run(self):
+        while not self._stop_event.wait(self._interval):
+            self.sync()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def metrics(self) -> Dict:
+        return {
+            "offset_ms": self.offset_ms,
+            "rtt_ms": self.rtt_ms,
+            "samples": len(self._samples),
+            "failures": self.failures,
+            "last_sync": self.last_sync,
+        }
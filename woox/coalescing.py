@@ -0,0 +1,169 @@
+import threading
+from time import perf_counter
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers using the same key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+
+class Hedger:
+    """Fire a backup call when the first one is slower than the recent p95.
+
+    Calls only go to the pool when a worker is free right now, so a call never
+    sits in the executor queue and queueing time never counts toward the hedge
+    delay. When the pool is busy the call runs unhedged on the caller's thread,
+    and a backup is skipped if no worker is free for it.
+
+    Latency is tracked per ``key`` (the endpoint), so a slow endpoint is
+    compared against its own p95 rather than one mixed with fast ones.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        min_samples: int = 20,
+        min_delay: float = 0.01,
+        max_workers: int = 32,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.window = window
+        self.hedged = 0
+        self._latency: Dict[Hashable, LatencyTracker] = {}
+        self._latency_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="woox-hedge"
+        )
+
+    def latency(self, key: Hashable = None) -> LatencyTracker:
+        with self._latency_lock:
+            tracker = self._latency.get(key)
+            if tracker is None:
+                tracker = self._latency[key] = LatencyTracker(self.window)
+            return tracker
+
+    def delay(self, key: Hashable = None) -> Optional[float]:
+        latency = self.latency(key)
+        if len(latency) < self.min_samples:
+            return None
+        return max(self.min_delay, latency.percentile(self.percentile))
+
+    @staticmethod
+    def _timed(fn: Callable[[], Any], latency: LatencyTracker) -> Any:
+        start = perf_counter()
+        result = fn()
+        latency.add(perf_counter() - start)
+        return result
+
+    def _run_slot(self, fn: Callable[[], Any], latency: LatencyTracker) -> Any:
+        try:
+            return self._timed(fn, latency)
+        finally:
+            self._slots.release()
+
+    def _submit(
+        self, fn: Callable[[], Any], latency: LatencyTracker
+    ) -> Optional[Future]:
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            return self._pool.submit(self._run_slot, fn, latency)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def run(self, fn: Callable[[], Any], key: Hashable = None) -> Any:
+        latency = self.latency(key)
+        delay = self.delay(key)
+        first = self._submit(fn, latency) if delay is not None else None
+        if first is None:
+            return self._timed(fn, latency)
+
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        second = self._submit(fn, latency)
+        if second is None:
+            return first.result()
+
+        self.hedged += 1
+        pending = {first, second}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None or not pending:
+                    return future.result()
+
+    def close(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,207 @@
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError(
+        "Columnar results require numpy: pip install python-woox[columnar]"
+    )
+
+# A string column is stored as categories only while it has at most this many
+# distinct values, or at most this share of distinct values per row.
+CATEGORY_MAX_UNIQUE = 256
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Strings are only parsed as numbers when written as plain decimals without
+# leading zeros, so ID-like values such as "007" stay strings.
+_INT_STRING = re.compile(r"-?(?:0|[1-9][0-9]*)")
+_FLOAT_STRING = re.compile(
+    r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?"
+)
+
+
+class ColumnarRows:
+    """Column-oriented view of the ``rows`` of a REST list response.
+
+    Numeric and boolean fields become typed NumPy arrays; so do numeric
+    strings such as ``created_time``. Low-cardinality string fields (symbol,
+    side, status, ...) are interned into a category table and stored as
+    ``int32`` codes, with ``-1`` for missing values; other strings stay an
+    object column. Slicing returns a new ``ColumnarRows`` that shares the
+    underlying buffers.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, "np.ndarray"],
+        categories: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.columns = columns
+        self.categories = categories or {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> "ColumnarRows":
+        if isinstance(rows, ColumnarRows):
+            raise TypeError("rows are already columnar")
+        rows = list(rows)
+        names: Dict[str, None] = {}
+        for row in rows:
+            for name in row:
+                names.setdefault(name)
+
+        columns = {}
+        categories = {}
+        for name in names:
+            values = [row.get(name) for row in rows]
+            column, cats = _build_column(values)
+            columns[name] = column
+            if cats is not None:
+                categories[name] = cats
+        return cls(columns, categories)
+
+    def __len__(self) -> int:
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, key: Union[str, slice, "np.ndarray"]):
+        if isinstance(key, str):
+            return self.columns[key]
+        return ColumnarRows(
+            {name: column[key] for name, column in self.columns.items()},
+            self.categories,
+        )
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    def decode(self, name: str) -> "np.ndarray":
+        """Return ``name`` with category codes replaced by their strings."""
+        column = self.columns[name]
+        if name not in self.categories:
+            return column
+        table = np.array(self.categories[name] + [None], dtype=object)
+        return table[column]
+
+    def code_of(self, name: str, value: str) -> int:
+        return self.categories[name].index(value)
+
+    def to_pandas(self):
+        import pandas as pd
+
+        data = {}
+        for name, column in self.columns.items():
+            if name in self.categories:
+                data[name] = pd.Categorical.from_codes(
+                    column, categories=self.categories[name]
+                )
+            else:
+                data[name] = column
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        arrays = []
+        for name, column in self.columns.items():
+            if name in self.categories:
+                arrays.append(
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(column, mask=column < 0),
+                        pa.array(self.categories[name], type=pa.string()),
+                    )
+                )
+            else:
+                arrays.append(pa.array(column))
+        return pa.Table.from_arrays(arrays, names=self.names)
+
+    def __repr__(self):
+        return f"ColumnarRows(rows={len(self)}, columns={self.names})"
+
+
+def _build_column(values: List):
+    present = [v for v in values if v is not None]
+    kinds = {type(v) for v in present}
+
+    if kinds and kinds <= {str}:
+        numeric = _parse_numeric(present)
+        if numeric is not None:
+            column = _numeric_column(_merge_missing(values, numeric))
+            if column is not None:
+                return column, None
+        return _build_string_column(values, present)
+
+    if kinds == {bool} and len(present) == len(values):
+        return np.array(values, dtype=bool), None
+    column = _numeric_column(values)
+    if column is not None:
+        return column, None
+    return _object_column(values), None
+
+
+def _numeric_column(values: List) -> Optional["np.ndarray"]:
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds or not kinds <= {int, float}:
+        return None
+    try:
+        if kinds == {int} and None not in values:
+            return np.array(values, dtype=np.int64)
+        if float not in kinds and any(
+            abs(v) > 2**53 for v in values if v is not None
+        ):
+            # Large integer IDs would silently lose digits as float64.
+            return None
+        return np.array(
+            [np.nan if v is None else v for v in values], dtype=np.float64
+        )
+    except OverflowError:
+        return None
+
+
+def _parse_numeric(present: List[str]) -> Optional[List]:
+    if all(_INT_STRING.fullmatch(v) for v in present):
+        return [int(v) for v in present]
+    if all(_FLOAT_STRING.fullmatch(v) for v in present):
+        return [float(v) for v in present]
+    return None
+
+
+def _merge_missing(values: List, parsed: List) -> List:
+    parsed = iter(parsed)
+    return [None if v is None else next(parsed) for v in values]
+
+
+def _build_string_column(values: List, present: List[str]):
+    unique = len(set(present))
+    if unique > max(
+        CATEGORY_MAX_UNIQUE, CATEGORY_MAX_UNIQUE_RATIO * len(values)
+    ):
+        return _object_column(values), None
+
+    lookup: Dict[str, int] = {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = -1
+            continue
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[sys.intern(value)] = len(lookup)
+        codes[i] = code
+    return codes, list(lookup)
+
+
+def _object_column(values: List) -> "np.ndarray":
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
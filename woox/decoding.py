@@ -0,0 +1,55 @@
+import json
+import zlib
+from typing import Any, Optional, Union
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+Frame = Union[str, bytes, bytearray, memoryview]
+
+
+class FrameDecoder:
+    """Turn websocket frames into messages with as few buffer copies as we can.
+
+    ``compression``:
+      * ``None``: frames are plain JSON (text or bytes).
+      * ``"gzip"``: every binary frame is a standalone gzip member. Frames
+        share no state, so each one gets a fresh zlib decompressor fed
+        straight from the frame buffer, without going through
+        ``gzip.decompress`` and its extra buffering.
+      * ``"deflate"``: frames form one raw deflate stream with a sync flush
+        after each message. A single decompressor is kept for the whole
+        connection so its window is reused.
+
+    With ``raw=True`` the decompressed payload is returned as-is (``str`` or
+    bytes-like) for consumers that parse lazily or only need a few fields.
+    """
+
+    def __init__(self, compression: Optional[str] = None, raw: bool = False):
+        if compression not in (None, "gzip", "deflate"):
+            raise ValueError(f"Unsupported frame compression: {compression}")
+        self.compression = compression
+        self.raw = raw
+        self._stream = None
+        if compression == "deflate":
+            self._stream = zlib.decompressobj(-zlib.MAX_WBITS)
+
+    def reset(self):
+        """Drop stream state; call after a reconnect."""
+        if self.compression == "deflate":
+            self._stream = zlib.decompressobj(-zlib.MAX_WBITS)
+
+    def _decompress(self, frame: Frame):
+        if self.compression == "gzip":
+            return zlib.decompressobj(GZIP_WBITS).decompress(frame)
+        if self.compression == "deflate":
+            return self._stream.decompress(frame)
+        return frame
+
+    def decode(self, frame: Frame) -> Any:
+        payload = frame if isinstance(frame, str) else self._decompress(frame)
+        if self.raw:
+            return payload
+        if isinstance(payload, memoryview):
+            payload = payload.tobytes()
+        # json.loads takes bytes directly, no intermediate str decode.
+        return json.loads(payload)
@@ -0,0 +1,225 @@
+import atexit
+import functools
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, Optional, Union
+
+TRACE = 5
+DEBUG = 10
+INFO = 20
+SUCCESS = 25
+WARNING = 30
+ERROR = 40
+CRITICAL = 50
+
+LEVELS = {
+    "TRACE": TRACE,
+    "DEBUG": DEBUG,
+    "INFO": INFO,
+    "SUCCESS": SUCCESS,
+    "WARNING": WARNING,
+    "ERROR": ERROR,
+    "CRITICAL": CRITICAL,
+}
+LEVEL_NAMES = {no: name for name, no in LEVELS.items()}
+
+Level = Union[int, str]
+
+
+class _EventLimit:
+    def __init__(self, every: int = 1, per_second: Optional[float] = None):
+        self.every = max(1, every)
+        self.per_second = per_second
+        self.seen = 0
+        self.dropped = 0
+        self.tokens = per_second or 0.0
+        self.updated = time.monotonic()
+
+    def allow(self) -> bool:
+        self.seen += 1
+        if self.seen % self.every:
+            self.dropped += 1
+            return False
+        if self.per_second:
+            now = time.monotonic()
+            self.tokens = min(
+                self.per_second,
+                self.tokens + (now - self.updated) * self.per_second,
+            )
+            self.updated = now
+            if self.tokens < 1:
+                self.dropped += 1
+                return False
+            self.tokens -= 1
+        return True
+
+
+class StructuredLogger:
+    """Level-gated front end for loguru, imported on the first write.
+
+    The level check happens before any message is built, so disabled levels
+    cost one integer comparison. ``event`` records carry structured fields
+    that are only formatted when written; with ``configure(async_sink=True)``
+    that formatting and the loguru call happen on a background thread.
+    """
+
+    def __init__(self, level: Level = INFO):
+        self.level = self._level_no(level)
+        self._limits: Dict[str, _EventLimit] = {}
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._worker: Optional[threading.Thread] = None
+        self._logger = None
+
+    @staticmethod
+    def _level_no(level: Level) -> int:
+        return LEVELS[level.upper()] if isinstance(level, str) else level
+
+    def configure(
+        self, level: Optional[Level] = None, async_sink: Optional[bool] = None
+    ):
+        if level is not None:
+            self.level = self._level_no(level)
+        if async_sink is True and self._worker is None:
+            self._queue = queue.SimpleQueue()
+            self._worker = threading.Thread(
+                target=self._drain,
+                args=(self._queue,),
+                daemon=True,
+                name="woox-log-sink",
+            )
+            self._worker.start()
+            # The worker is a daemon; flush what is queued at exit.
+            atexit.register(self.close)
+        elif async_sink is False and self._worker is not None:
+            self.close()
+
+    def enabled(self, level: Level) -> bool:
+        if isinstance(level, str):
+            level = LEVELS[level]
+        return level >= self.level
+
+    def limit(
+        self, event: str, every: int = 1, per_second: Optional[float] = None
+    ):
+        """Keep one in ``every`` ``event`` records, at most ``per_second``."""
+        self._limits[event] = _EventLimit(every, per_second)
+
+    def event(self, level: int, name: str, **fields):
+        if level < self.level:
+            return
+        limit = self._limits.get(name)
+        if limit is not None:
+            if not limit.allow():
+                return
+            if limit.dropped:
+                fields["dropped"] = limit.dropped
+                limit.dropped = 0
+        self._emit(level, name, fields, None, None, 1)
+
+    def log(self, level: Level, message, *args, **kwargs):
+        self._log(self._level_no(level), message, args, kwargs)
+
+    def _log(self, level: int, message, args, kwargs):
+        if level < self.level:
+            return
+        self._emit(level, None, None, message, (args, kwargs), 2)
+
+    def trace(self, message, *args, **kwargs):
+        self._log(TRACE, message, args, kwargs)
+
+    def debug(self, message, *args, **kwargs):
+        self._log(DEBUG, message, args, kwargs)
+
+    def info(self, message, *args, **kwargs):
+        self._log(INFO, message, args, kwargs)
+
+    def warning(self, message, *args, **kwargs):
+        self._log(WARNING, message, args, kwargs)
+
+    def error(self, message, *args, **kwargs):
+        self._log(ERROR, message, args, kwargs)
+
+    def critical(self, message, *args, **kwargs):
+        self._log(CRITICAL, message, args, kwargs)
+
+    def _emit(self, level, name, fields, message, extra, depth):
+        # ``depth`` is the number of frames between our caller and the user
+        # code, so loguru reports the user's location and not this module.
+        if self._queue is not None:
+            caller = _caller_of(sys._getframe(depth + 1))
+            self._queue.put_nowait(
+                (level, name, fields, message, extra, caller)
+            )
+        else:
+            record = (level, name, fields, message, extra, None)
+            self._write(record, depth + 2)
+
+    def _write(self, record, depth: int = 0):
+        level, name, fields, message, extra, caller = record
+        if self._logger is None:
+            from loguru import logger
+
+            self._logger = logger
+        if name is not None:
+            message = " ".join(
+                [name] + [f"{key}={value!r}" for key, value in fields.items()]
+            )
+            args, kwargs = (), {}
+        else:
+            args, kwargs = extra
+            message = str(message)
+        level = LEVEL_NAMES.get(level, level)
+        if caller is None:
+            logger = self._logger.opt(depth=depth)
+        else:
+            logger = self._logger.patch(functools.partial(_patch, caller))
+        logger.log(level, message, *args, **kwargs)
+
+    def _drain(self, sink: queue.SimpleQueue):
+        while True:
+            record = sink.get()
+            if record is None:
+                break
+            try:
+                self._write(record)
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+
+    def close(self):
+        """Flush the background sink and go back to synchronous writes."""
+        if self._worker is None:
+            return
+        atexit.unregister(self.close)
+        sink, worker = self._queue, self._worker
+        self._queue, self._worker = None, None
+        sink.put_nowait(None)
+        worker.join()
+
+
+def _caller_of(frame):
+    code = frame.f_code
+    return (
+        frame.f_globals.get("__name__"),
+        code.co_name,
+        frame.f_lineno,
+        code.co_filename,
+    )
+
+
+def _patch(caller, record):
+    name, function, line, path = caller
+    filename = os.path.basename(path)
+    record.update(
+        name=name,
+        function=function,
+        line=line,
+        module=os.path.splitext(filename)[0],
+        file=type(record["file"])(filename, path),
+    )
+
+
+log = StructuredLogger()
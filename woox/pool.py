@@ -0,0 +1,145 @@
+import copy
+import threading
+from typing import Callable, Dict, Iterator, Optional
+
+from woox.client import Client
+from woox.transport import TransportConfig
+
+
+class AccountPool:
+    """Many sub-accounts over one HTTP connection pool and one stream thread.
+
+    Every account gets its own ``Client`` (and therefore its own signing
+    keys) but all of them reuse the pool's ``requests`` session. Websocket
+    traffic goes through a single ``ThreadedWebsocketManager``: public
+    market-data sockets are shared, and each account gets one private socket
+    authenticated with its own key.
+    """
+
+    def __init__(
+        self,
+        application_id: str,
+        testnet: bool = False,
+        transport: Optional[TransportConfig] = None,
+    ):
+        self.application_id = application_id
+        self.testnet = testnet
+        self.public = Client(
+            None, None, application_id, testnet, transport=transport
+        )
+        self.session = self.public.session
+        # Only the public client pings the shared session when idle.
+        self._account_transport = copy.copy(self.public.transport)
+        self._account_transport.idle_ping_interval = None
+        self._accounts: Dict[str, Client] = {}
+        self._lock = threading.Lock()
+        self._twm = None
+
+    @property
+    def clock(self):
+        return self.public.clock
+
+    def sync_clock(self, interval: float = 60):
+        """Run one clock estimator for every account and the stream thread."""
+        clock = self.public.sync_clock(interval)
+        for client in self._accounts.values():
+            client.clock = clock
+        if self._twm:
+            self._twm.clock = clock
+        return clock
+
+    def add_account(
+        self,
+        name: str,
+        api: str,
+        secret: str,
+        application_id: Optional[str] = None,
+        **client_options,
+    ) -> Client:
+        with self._lock:
+            if name in self._accounts:
+                raise ValueError(f"Account {name} already in pool")
+            client = Client(
+                api,
+                secret,
+                application_id or self.application_id,
+                self.testnet,
+                transport=self._account_transport,
+                session=self.session,
+                clock=self.clock,
+                **client_options,
+            )
+            self._accounts[name] = client
+        return client
+
+    def remove_account(self, name: str):
+        with self._lock:
+            client = self._accounts.pop(name)
+        private_socket = self._private_socket_name(name)
+        if self._twm:
+            self._twm.stop_socket(private_socket)
+        client.close()
+
+    def __getitem__(self, name: str) -> Client:
+        return self._accounts[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._accounts
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._accounts))
+
+    @property
+    def streams(self):
+        if self._twm is None:
+            from woox.streams import ThreadedWebsocketManager
+
+            self._twm = ThreadedWebsocketManager(
+                application_id=self.application_id,
+                testnet=self.testnet,
+                clock=self.clock,
+            )
+            self._twm.daemon = True
+            self._twm.start()
+        return self._twm
+
+    def start_public_socket(
+        self, callback: Callable, socket_name: str = "market_connection"
+    ):
+        return self.streams.start_socket(callback, socket_name=socket_name)
+
+    def start_private_socket(self, name: str, callback: Callable):
+        client = self._accounts[name]
+        socket_name = self._private_socket_name(name)
+        socket = self.streams.start_socket(
+            callback,
+            socket_name=socket_name,
+            auth=True,
+            application_id=client.application_id,
+        )
+        self.streams.authentication(
+            socket_name=socket_name,
+            api_key=client.API_KEY,
+            api_secret=client.API_SECRET,
+        )
+        return socket
+
+    def subscribe(self, socket_name: str, **params):
+        self.streams.subscribe(socket_name, **params)
+
+    def subscribe_private(self, name: str, **params):
+        self.streams.subscribe(self._private_socket_name(name), **params)
+
+    @staticmethod
+    def _private_socket_name(name: str) -> str:
+        return f"private_{name}"
+
+    def close(self):
+        if self._twm:
+            self._twm.stop()
+        for name in list(self._accounts):
+            self._accounts.pop(name).close()
+        self.public.close()
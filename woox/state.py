@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import deque
+from typing import Dict, Optional
+
+from woox import enums
+
+SNAPSHOT_MAGIC = b"WOOXSNP1"
+
+log = logging.getLogger(__name__)
+
+TERMINAL_ORDER_STATUS = {
+    enums.ORDER_STATUS_FILLED,
+    enums.ORDER_STATUS_CANCELED,
+    enums.ORDER_STATUS_REJECTED,
+    enums.ORDER_STATUS_COMPLETED,
+}
+
+
+class StreamState:
+    """In-memory market and account state fed from websocket messages.
+
+    Tracks order books, recent kline bars, open orders, the subscription set
+    per socket and the last ``ts`` seen per topic, so a restarted process can
+    restore it from a snapshot and only catch up what it missed.
+    """
+
+    def __init__(self, max_bars: int = 500):
+        self.max_bars = max_bars
+        self.books: Dict[str, Dict] = {}
+        self.book_ts: Dict[str, int] = {}
+        self.bars: Dict[str, deque] = {}
+        self.orders: Dict[str, Dict] = {}
+        self.subscriptions: Dict[str, Dict[str, Dict]] = {}
+        self.sequences: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record_subscription(self, socket_name: str, params: Dict):
+        topic = params.get("topic")
+        if not topic:
+            return
+        with self._lock:
+            topics = self.subscriptions.setdefault(socket_name, {})
+            if params.get("event") == "unsubscribe":
+                topics.pop(topic, None)
+            else:
+                topics[topic] = dict(params)
+
+    def last_ts(self, topic: str) -> Optional[int]:
+        return self.sequences.get(topic)
+
+    def update(self, msg) -> None:
+        if not isinstance(msg, dict):
+            return
+        topic = msg.get("topic")
+        data = msg.get("data")
+        if not topic or data is None:
+            return
+        with self._lock:
+            if "ts" in msg:
+                self.sequences[topic] = msg["ts"]
+            if topic.endswith("@orderbook"):
+                self._replace_book(data, msg.get("ts"))
+            elif topic.endswith("@orderbookupdate"):
+                self._update_book(data, msg.get("ts"))
+            elif "@kline_" in topic:
+                self._add_bar(topic, data)
+            elif topic == "executionreport":
+                self._update_order(data)
+
+    def _replace_book(self, data: Dict, ts: Optional[int]):
+        symbol = data["symbol"]
+        self.books[symbol] = {
+            "asks": {float(p): float(q) for p, q in data.get("asks", [])},
+            "bids": {float(p): float(q) for p, q in data.get("bids", [])},
+        }
+        self.book_ts[symbol] = ts
+
+    def _update_book(self, data: Dict, ts: Optional[int]):
+        symbol = data["symbol"]
+        book = self.books.get(symbol)
+        if book is None:
+            return
+        # A delta only applies on top of the update it follows; otherwise
+        # (e.g. a book restored from an old snapshot) the book is dropped
+        # until the next @orderbook snapshot replaces it.
+        prev_ts = data.get("prevTs")
+        if prev_ts is None or prev_ts != self.book_ts.get(symbol):
+            log.warning(
+                f"{symbol} book gap: prevTs {prev_ts}, "
+                f"have {self.book_ts.get(symbol)}; dropping book"
+            )
+            del self.books[symbol]
+            self.book_ts.pop(symbol, None)
+            return
+        self.book_ts[symbol] = ts
+        for side in ("asks", "bids"):
+            levels = book[side]
+            for price, qty in data.get(side, []):
+                if float(qty) == 0:
+                    levels.pop(float(price), None)
+                else:
+                    levels[float(price)] = float(qty)
+
+    def _add_bar(self, topic: str, data: Dict):
+        bars = self.bars.get(topic)
+        if bars is None:
+            bars = self.bars[topic] = deque(maxlen=self.max_bars)
+        if bars and bars[-1].get("startTime") == data.get("startTime"):
+            bars[-1] = data
+        else:
+            bars.append(data)
+
+    def _update_order(self, data: Dict):
+        oid = str(data.get("orderId"))
+        if data.get("status") in TERMINAL_ORDER_STATUS:
+            self.orders.pop(oid, None)
+        else:
+            self.orders[oid] = data
+
+    def to_bytes(self) -> bytes:
+        with self._lock:
+            payload = {
+                "max_bars": self.max_bars,
+                "books": {
+                    symbol: {
+                        side: sorted(levels.items())
+                        for side, levels in book.items()
+                    }
+                    for symbol, book in self.books.items()
+                },
+                "book_ts": self.book_ts,
+                "bars": {
+                    topic: list(bars) for topic, bars in self.bars.items()
+                },
+                "orders": self.orders,
+                "subscriptions": self.subscriptions,
+                "sequences": self.sequences,
+            }
+            raw = json.dumps(payload, separators=(",", ":")).encode()
+        return SNAPSHOT_MAGIC + zlib.compress(raw)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "StreamState":
+        if not blob.startswith(SNAPSHOT_MAGIC):
+            raise ValueError("Not a woox state snapshot")
+        payload = json.loads(zlib.decompress(blob[len(SNAPSHOT_MAGIC) :]))
+        state = cls(max_bars=payload["max_bars"])
+        state.books = {
+            symbol: {side: dict(levels) for side, levels in book.items()}
+            for symbol, book in payload["books"].items()
+        }
+        state.book_ts = payload.get("book_ts", {})
+        state.bars = {
+            topic: deque(bars, maxlen=state.max_bars)
+            for topic, bars in payload["bars"].items()
+        }
+        state.orders = payload["orders"]
+        state.subscriptions = payload["subscriptions"]
+        state.sequences = payload["sequences"]
+        return state
+
+    def save(self, path: str):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, max_bars: int = 500) -> "StreamState":
+        """Restore from ``path``, or start empty if it is missing or bad."""
+        if not os.path.exists(path):
+            return cls(max_bars=max_bars)
+        with open(path, "rb") as f:
+            blob = f.read()
+        try:
+            return cls.from_bytes(blob)
+        except (ValueError, KeyError, TypeError, zlib.error) as e:
+            log.warning(f"ignoring unreadable snapshot {path}: {e}")
+            return cls(max_bars=max_bars)
+
+
+class StateSnapshotter(threading.Thread):
+    def __init__(self, state: StreamState, path: str, interval: float = 30):
+        super().__init__(daemon=True, name="woox-state-snapshot")
+        self.state = state
+        self.path = path
+        self._interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self._interval):
+            self.state.save(self.path)
+
+    def stop(self):
+        self._stop_event.set()
+        # Wait for a periodic save in progress; both write the same .tmp file.
+        if self.is_alive():
+            self.join()
+        self.state.save(self.path)
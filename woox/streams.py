@@ -1,19 +1,37 @@
 import asyncio
-import gzip
 import json
+import threading
+import zlib
 import logging
 import time
+from collections import deque
 from enum import Enum
 from random import random
 from typing import Optional, List, Dict, Callable, Any
 
-import websockets as ws
-from woox import AsyncClient
-from woox import signature
+try:
+    import websockets as ws
+except ImportError:
+    raise ImportError(
+        "Websocket streams require websockets: pip install python-woox[async]"
+    )
+from woox.client import AsyncClient
+from woox.authentication import signature
+from woox.decoding import FrameDecoder
+from woox.state import StateSnapshotter, StreamState
 from .threaded_stream import ThreadedApiManager
 
 KEEPALIVE_TIMEOUT = 5 * 60  # 5 minutes
 
+PRIORITY_CONTROL = 0
+PRIORITY_BULK = 1
+CONTROL_EVENTS = ("pong", "auth")
+
+# Fixed control frames are serialized once instead of per send.
+PONG_FRAME = '{"event":"pong"}'
+
+encode_frame = json.JSONEncoder(separators=(",", ":")).encode
+
 
 class WSListenerState(Enum):
     INITIALISING = "Initialising"
@@ -25,6 +43,8 @@ class WSListenerState(Enum):
 class ReconnectingWebsocket:
     MAX_RECONNECTS = 5
     MAX_RECONNECT_SECONDS = 60
+    MAX_QUEUE_SIZE = 100
+    SEND_BATCH_SIZE = 50
     TIMEOUT = 60
 
     def __init__(
@@ -34,6 +54,9 @@ class ReconnectingWebsocket:
         name: Optional[str] = None,
         is_binary: bool = False,
         exit_coro=None,
+        callback: Optional[Callable] = None,
+        raw: bool = False,
+        compression: Optional[str] = None,
     ):
         self._loop = loop or asyncio.get_event_loop()
         self._log = logging.getLogger(__name__)
@@ -42,11 +65,27 @@ class ReconnectingWebsocket:
         self._exit_coro = exit_coro
         self._reconnects = 0
         self._is_binary = is_binary
+        if compression is None and is_binary:
+            compression = "gzip"
+        self._decoder = FrameDecoder(compression, raw=raw)
         self._conn = None
         self._socket = None
         self.ws: Optional[ws.WebSocketClientProtocol] = None
         self.ws_state = WSListenerState.INITIALISING
-        self._queue = asyncio.Queue(loop=self._loop)
+        # With a callback, messages are delivered straight from the read loop
+        # and the queue only carries wake-ups for the listener.
+        self._callback = callback
+        self._queue = asyncio.Queue()
+        self._watchdog: Optional[asyncio.TimerHandle] = None
+        self._watchdog_conn = None
+        self._last_recv = 0.0
+        # Outbound frames: control (pong/auth) always goes before bulk
+        # (subscribe/unsubscribe); a single writer task drains both lanes.
+        self._control = deque()
+        self._bulk = deque()
+        self._send_ready = asyncio.Event()
+        self._connected = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
 
     async def __aenter__(self):
         await self.connect()
@@ -56,7 +95,11 @@ class ReconnectingWebsocket:
         if self._exit_coro:
             await self._exit_coro(self._name)
         self.ws_state = WSListenerState.EXITING
-        if self.ws:
+        self._connected.clear()
+        if self._writer:
+            self._writer.cancel()
+        if self.ws and hasattr(self.ws, "fail_connection"):
+            # Legacy websockets protocol; newer versions close in __aexit__.
             self.ws.fail_connection()
         if self._conn:
             await self._conn.__aexit__(exc_type, exc_val, exc_tb)
@@ -72,6 +115,8 @@ class ReconnectingWebsocket:
             await self._reconnect()
             return
         self.ws_state = WSListenerState.STREAMING
+        self._decoder.reset()
+        self._connected.set()
 
         self._reconnects = 0
         await self._after_connect()
@@ -81,9 +126,54 @@ class ReconnectingWebsocket:
         pass
 
     async def send_msg(self, msg):
-        while not self.ws:
-            time.sleep(0.1)
-        await self.ws.send(json.dumps(msg))
+        self.send_nowait(msg)
+
+    def send_nowait(self, msg, priority: int = PRIORITY_BULK):
+        """Queue ``msg`` (dict or pre-serialized frame); loop thread only."""
+        if not isinstance(msg, (str, bytes)):
+            msg = encode_frame(msg)
+        if priority == PRIORITY_CONTROL:
+            self._control.append(msg)
+        else:
+            self._bulk.append(msg)
+        self._wake_writer()
+
+    def send_many(self, frames: List, priority: int = PRIORITY_BULK):
+        lane = self._control if priority == PRIORITY_CONTROL else self._bulk
+        lane.extend(frames)
+        self._wake_writer()
+
+    def _wake_writer(self):
+        self._send_ready.set()
+        if self._writer is None or self._writer.done():
+            self._writer = self._loop.create_task(self._write_loop())
+
+    async def _write_loop(self):
+        control, bulk = self._control, self._bulk
+        sent = 0
+        while self.ws_state != WSListenerState.EXITING:
+            if not control and not bulk:
+                self._send_ready.clear()
+                await self._send_ready.wait()
+                continue
+            await self._connected.wait()
+            # Re-check the control lane before every frame, and yield to the
+            # read loop between batches so an incoming ping can queue its pong
+            # ahead of the rest of a large subscribe burst.
+            sent += 1
+            if sent % self.SEND_BATCH_SIZE == 0:
+                await asyncio.sleep(0)
+            lane = control if control else bulk
+            frame = lane.popleft()
+            try:
+                await self.ws.send(frame)
+            except asyncio.CancelledError:
+                lane.appendleft(frame)
+                raise
+            except Exception as e:
+                logging.debug(f"send failed, waiting for reconnect {e}")
+                lane.appendleft(frame)
+                self._connected.clear()
 
     async def _before_connect(self):
         pass
@@ -92,76 +182,97 @@ class ReconnectingWebsocket:
         pass
 
     def _handle_message(self, evt):
-        if self._is_binary:
-            try:
-                evt = gzip.decompress(evt)
-            except (ValueError, OSError):
-                return None
         try:
-            return json.loads(evt)
+            return self._decoder.decode(evt)
+        except zlib.error:
+            return None
         except ValueError:
             self._log.debug(f"error parsing evt json:{evt}")
             return None
 
+    def _start_watchdog(self, conn):
+        self._last_recv = self._loop.time()
+        self._watchdog_conn = conn
+        self._watchdog = self._loop.call_later(self.TIMEOUT, self._check_idle)
+
+    def _stop_watchdog(self, conn):
+        # A reconnect may already have armed the watchdog for a newer
+        # connection; only the read loop that owns it may cancel it.
+        if self._watchdog and self._watchdog_conn is conn:
+            self._watchdog.cancel()
+            self._watchdog = None
+
+    def _check_idle(self):
+        # One timer per connection: messages only bump ``_last_recv`` and the
+        # timer re-arms itself for the remaining idle budget.
+        idle = self._loop.time() - self._last_recv
+        if idle < self.TIMEOUT:
+            self._watchdog = self._loop.call_later(
+                self.TIMEOUT - idle, self._check_idle
+            )
+            return
+        self._watchdog = None
+        logging.debug(f"no message in {self.TIMEOUT} seconds")
+        self._no_message_received_reconnect()
+
+    def _enqueue(self, msg):
+        if self._queue.qsize() < self.MAX_QUEUE_SIZE:
+            self._queue.put_nowait(msg)
+
     async def _read_loop(self):
-        while True:
-            res = None
-            if not self.ws or self.ws_state != WSListenerState.STREAMING:
-                await self._wait_for_reconnect()
-                break
-            if self.ws_state == WSListenerState.EXITING:
-                break
-            if self.ws.state == ws.protocol.State.CLOSING:
-                break
-            if self.ws.state == ws.protocol.State.CLOSED:
+        conn = self.ws
+        if not conn or self.ws_state != WSListenerState.STREAMING:
+            await self._wait_for_reconnect()
+            return
+
+        now = self._loop.time
+        handle = self._handle_message
+        deliver = self._callback or self._enqueue
+        self._start_watchdog(conn)
+        try:
+            while self.ws_state == WSListenerState.STREAMING:
                 try:
-                    await self._reconnect()
-                except Exception as e:
-                    print(e)
-                else:
-                    break
-            try:
-                res = await asyncio.wait_for(
-                    self.ws.recv(), timeout=self.TIMEOUT
-                )
-            except asyncio.TimeoutError:
-                logging.debug(f"no message in {self.TIMEOUT} seconds")
-                await self._reconnect()
-            except asyncio.CancelledError as e:
-                logging.debug(f"cancelled error {e}")
-                break
-            except asyncio.IncompleteReadError as e:
-                logging.debug(f"incomplete read error {e}")
-            except Exception as e:
-                logging.debug(f"exception {e}")
-                await self._reconnect()
-                break
-            else:
-                if self.ws_state in (
-                    WSListenerState.EXITING,
-                    WSListenerState.RECONNECTING,
-                ):
+                    res = await conn.recv()
+                except asyncio.CancelledError as e:
+                    logging.debug(f"cancelled error {e}")
                     break
-                res = self._handle_message(res)
-                if self.ws_state in (
-                    WSListenerState.EXITING,
-                    WSListenerState.RECONNECTING,
-                ):
-                    break
-
-            if res and self._queue.qsize() < 100:
-                await self._queue.put(res)
+                except asyncio.IncompleteReadError as e:
+                    logging.debug(f"incomplete read error {e}")
+                    continue
+                except Exception as e:
+                    logging.debug(f"exception {e}")
+                    self._stop_watchdog(conn)
+                    if self.ws_state == WSListenerState.STREAMING:
+                        await self._reconnect()
+                    return
+                self._last_recv = now()
+                res = handle(res)
+                if res is None:
+                    continue
+                try:
+                    deliver(res)
+                except Exception:
+                    self._log.exception(f"{self._name} callback failed")
+        finally:
+            self._stop_watchdog(conn)
 
     async def recv(self):
-        res = None
-        while not res:
+        return await self._queue.get()
+
+    async def recv_batch(self, max_size: int = MAX_QUEUE_SIZE) -> List:
+        """Wait for one message, then drain whatever else is already queued."""
+        batch = [await self._queue.get()]
+        get_nowait = self._queue.get_nowait
+        while len(batch) < max_size:
             try:
-                res = await asyncio.wait_for(
-                    self._queue.get(), timeout=self.TIMEOUT
-                )
-            except asyncio.TimeoutError:
-                logging.debug(f"no message in {self.TIMEOUT} seconds")
-        return res
+                batch.append(get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    def wake(self):
+        """Unblock ``recv``/``recv_batch`` with a ``None`` message."""
+        self._queue.put_nowait(None)
 
     async def _wait_for_reconnect(self):
         while self.ws_state == WSListenerState.RECONNECTING:
@@ -176,6 +287,7 @@ class ReconnectingWebsocket:
         return round(random() * min(self.MAX_RECONNECT_SECONDS, expo - 1) + 1)
 
     async def before_reconnect(self):
+        self._connected.clear()
         if self.ws:
             await self._conn.__aexit__(None, None, None)
             self.ws = None
@@ -203,6 +315,12 @@ class ReconnectingWebsocket:
             raise "MaximumReconnectRetry"
 
 
+def _priority(params: Dict) -> int:
+    if params.get("event") in CONTROL_EVENTS:
+        return PRIORITY_CONTROL
+    return PRIORITY_BULK
+
+
 class wooxSocketManager:
     STREAM_URL = "wss://wss.woo.network/ws/stream/{}"
     STREAM_TESTNET_URL = "wss://wss.staging.woo.network/ws/stream/{}"
@@ -236,11 +354,25 @@ class wooxSocketManager:
             self.private_ws_url = self.PSTREAM_TESTNET_URL
 
     def _get_socket(
-        self, socket_name: str, is_binary: bool = False, auth: bool = False
+        self,
+        socket_name: str,
+        is_binary: bool = False,
+        auth: bool = False,
+        application_id: Optional[str] = None,
+        callback: Optional[Callable] = None,
+        raw: bool = False,
+        compression: Optional[str] = None,
     ) -> str:
         conn_id = f"{socket_name}"
         if auth:
             url = self.private_ws_url
+            if application_id:
+                template = (
+                    type(self).PSTREAM_TESTNET_URL
+                    if self.testnet
+                    else type(self).PSTREAM_URL
+                )
+                url = template.format(application_id)
         else:
             url = self.ws_url
         if conn_id not in self._conns:
@@ -250,23 +382,50 @@ class wooxSocketManager:
                 url=url,
                 exit_coro=self._exit_socket,
                 is_binary=is_binary,
+                callback=callback,
+                raw=raw,
+                compression=compression,
             )
 
         return self._conns[conn_id]
 
     async def subscribe(self, socket_name: str, **params):
+        self.send(socket_name, encode_frame(params), _priority(params))
+
+    def send(self, socket_name: str, frames, priority: int = PRIORITY_BULK):
+        """Queue one frame or a list of frames; loop thread only."""
         try:
-            await self._conns[socket_name].send_msg(params)
+            socket = self._conns[socket_name]
         except KeyError:
             self._log.warning(
                 f"Connection name: <{socket_name}> not create and start!"
             )
+            return
+        if isinstance(frames, list):
+            socket.send_many(frames, priority)
+        else:
+            socket.send_nowait(frames, priority)
 
     async def _exit_socket(self, name: str):
         await self._stop_socket(name)
 
-    def get_socket(self, socket_name, auth: bool = False):
-        return self._get_socket(socket_name, auth=auth)
+    def get_socket(
+        self,
+        socket_name,
+        auth: bool = False,
+        application_id: Optional[str] = None,
+        callback: Optional[Callable] = None,
+        raw: bool = False,
+        compression: Optional[str] = None,
+    ):
+        return self._get_socket(
+            socket_name,
+            auth=auth,
+            application_id=application_id,
+            callback=callback,
+            raw=raw,
+            compression=compression,
+        )
 
     async def _stop_socket(self, conn_key):
         if conn_key not in self._conns:
@@ -282,11 +441,24 @@ class ThreadedWebsocketManager(ThreadedApiManager):
         api_secret: Optional[str] = None,
         application_id: str = "",
         testnet: bool = False,
+        clock=None,
+        state: Optional[StreamState] = None,
+        snapshot_path: Optional[str] = None,
+        snapshot_interval: float = 30,
     ):
-        super().__init__(api_key, api_secret, application_id, testnet)
+        super().__init__(api_key, api_secret, application_id, testnet, clock)
         self._bsm: Optional[wooxSocketManager] = None
         self.api = api_key
         self.secret = api_secret
+        if state is None and snapshot_path:
+            state = StreamState.load(snapshot_path)
+        self.state = state
+        self._snapshotter = None
+        if state is not None and snapshot_path:
+            self._snapshotter = StateSnapshotter(
+                state, snapshot_path, snapshot_interval
+            )
+            self._snapshotter.start()
 
     async def _before_socket_listener_start(self):
         assert self._client
@@ -297,16 +469,30 @@ class ThreadedWebsocketManager(ThreadedApiManager):
         callback: Callable,
         socket_name: str,
         auth: bool = False,
+        application_id: Optional[str] = None,
+        direct: bool = False,
+        raw: bool = False,
+        compression: Optional[str] = None,
     ) -> str:
         while not self._bsm:
             time.sleep(0.1)
 
-        socket = getattr(self._bsm, "get_socket")(socket_name, auth=auth)
+        if self.state is not None:
+            callback = self._track_state(callback)
+        dispatch = self._dispatcher(socket_name, callback, self.ping)
+        socket = getattr(self._bsm, "get_socket")(
+            socket_name,
+            auth=auth,
+            application_id=application_id,
+            callback=dispatch if direct else None,
+            raw=raw,
+            compression=compression,
+        )
         name = socket._name
         self._socket_running[name] = True
         self._loop.call_soon_threadsafe(
             asyncio.create_task,
-            self.start_listener(socket, socket._name, callback, self.ping),
+            self.start_listener(socket, socket._name, dispatch),
         )
 
         return socket
@@ -316,30 +502,92 @@ class ThreadedWebsocketManager(ThreadedApiManager):
         callback: Callable,
         socket_name: str,
         auth: bool = False,
+        application_id: Optional[str] = None,
+        direct: bool = False,
+        raw: bool = False,
+        compression: Optional[str] = None,
     ) -> str:
+        """Start ``socket_name`` and feed its messages to ``callback``.
+
+        With ``direct=True`` the callback runs inside the socket read loop,
+        skipping the internal queue; it must not block. With ``raw=True`` the
+        callback receives the undecoded JSON payload (``str``/``bytes``).
+        ``compression`` (``"gzip"`` or ``"deflate"``) selects how binary
+        frames are decompressed; see ``FrameDecoder``.
+        """
         return self._start_socket(
             callback=callback,
             socket_name=socket_name,
             auth=auth,
+            application_id=application_id,
+            direct=direct,
+            raw=raw,
+            compression=compression,
         )
 
-    def subscribe(self, socket_name: str, **params):
+    def _track_state(self, callback: Callable) -> Callable:
+        update = self.state.update
+
+        def _callback(msg):
+            update(msg)
+            callback(msg)
+
+        return _callback
+
+    def resubscribe(self, socket_name: str):
+        """Replay the restored subscription set of ``socket_name``."""
+        if self.state is None:
+            return
+        topics = self.state.subscriptions.get(socket_name, {})
+        frames = [encode_frame(params) for params in list(topics.values())]
+        if frames:
+            self._send(socket_name, frames, PRIORITY_BULK)
+
+    def _send(self, socket_name: str, frames, priority: int):
         while not self._bsm:
             time.sleep(0.1)
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
-        if loop and loop.is_running():
-            loop.create_task(self._bsm.subscribe(socket_name, **params))
+        if threading.get_ident() == self._loop_thread_id:
+            self._bsm.send(socket_name, frames, priority)
         else:
-            asyncio.run(self._bsm.subscribe(socket_name, **params))
+            self._loop.call_soon_threadsafe(
+                self._bsm.send, socket_name, frames, priority
+            )
+
+    def subscribe(self, socket_name: str, **params):
+        if self.state is not None:
+            self.state.record_subscription(socket_name, params)
+        # Serialize on the caller's thread, not on the event loop.
+        self._send(socket_name, encode_frame(params), _priority(params))
 
-    def authentication(self, socket_name="private_connection"):
-        ts = str(int(time.time() * 1000))
-        sign = signature(ts, self.secret)
+    def subscribe_many(
+        self,
+        socket_name: str,
+        topics: List[str],
+        event: str = "subscribe",
+        **params,
+    ):
+        """Send one ``event`` frame per topic in a single loop hop."""
+        frames = []
+        for topic in topics:
+            msg = dict(params, topic=topic, event=event)
+            if self.state is not None:
+                self.state.record_subscription(socket_name, msg)
+            frames.append(encode_frame(msg))
+        self._send(socket_name, frames, PRIORITY_BULK)
+
+    def authentication(
+        self,
+        socket_name="private_connection",
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+    ):
+        if self.clock:
+            ts = str(self.clock.now_ms())
+        else:
+            ts = str(int(time.time() * 1000))
+        sign = signature(ts, api_secret or self.secret)
         params = {}
-        params["apikey"] = self.api
+        params["apikey"] = api_key or self.api
         params["sign"] = sign
         params["timestamp"] = ts
         self.subscribe(
@@ -350,4 +598,9 @@ class ThreadedWebsocketManager(ThreadedApiManager):
         )
 
     def ping(self, name):
-        self.subscribe(name, event="pong")
+        self._send(name, PONG_FRAME, PRIORITY_CONTROL)
+
+    def stop(self):
+        if self._snapshotter:
+            self._snapshotter.stop()
+        super().stop()
@@ -1,7 +1,11 @@
 import asyncio
+import re
 import threading
-from typing import Callable, Optional, Dict
-from woox import AsyncClient
+from typing import Any, Callable, Optional, Dict
+from woox.client import AsyncClient
+
+_PING_TEXT = re.compile(r'"event"\s*:\s*"ping"')
+_PING_BYTES = re.compile(rb'"event"\s*:\s*"ping"')
 
 
 class ThreadedApiManager(threading.Thread):
@@ -11,18 +15,23 @@ class ThreadedApiManager(threading.Thread):
         api_secret: Optional[str] = None,
         application_id: str = "",
         testnet: bool = False,
+        clock=None,
     ):
         """Initialise the wooxSocketManager"""
         super().__init__()
+        self.clock = clock
         self._loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
         self._client: Optional[AsyncClient] = None
         self._running: bool = True
         self._socket_running: Dict[str, bool] = {}
+        self._sockets: Dict[str, Any] = {}
+        self._loop_thread_id: Optional[int] = None
         self._client_params = {
             "api": api_key,
             "secret": api_secret,
             "application_id": application_id,
             "testnet": testnet,
+            "clock": clock,
         }
 
     async def _before_socket_listener_start(self):
@@ -38,29 +47,47 @@ class ThreadedApiManager(threading.Thread):
         while self._socket_running:
             await asyncio.sleep(0.2)
 
-    async def start_listener(
-        self, socket, name: str, callback, ping: Optional[Callable] = None
+    @staticmethod
+    def _is_ping(msg) -> bool:
+        if isinstance(msg, dict):
+            return msg.get("event") == "ping"
+        # Raw payloads are only scanned, never parsed, to spot pings.
+        if isinstance(msg, str):
+            return _PING_TEXT.search(msg) is not None
+        return _PING_BYTES.search(msg) is not None
+
+    def _dispatcher(
+        self, name: str, callback, ping: Optional[Callable] = None
     ):
+        is_ping = self._is_ping
+
+        def dispatch(msg):
+            if ping is not None and is_ping(msg):
+                ping(name)
+            callback(msg)
+
+        return dispatch
+
+    async def start_listener(self, socket, name: str, dispatch: Callable):
+        self._sockets[name] = socket
         async with socket as s:
             while self._socket_running[name]:
-                try:
-                    msg = await asyncio.wait_for(s.recv(), 3)
-                except asyncio.TimeoutError:
-                    ...
-                    continue
-                if not msg:
-                    continue
-                if "event" in msg and msg["event"] == "ping":
-                    ping(name)
-                callback(msg)
+                for msg in await s.recv_batch():
+                    if msg is not None:
+                        dispatch(msg)
         del self._socket_running[name]
+        del self._sockets[name]
 
     def run(self):
+        self._loop_thread_id = threading.get_ident()
         self._loop.run_until_complete(self.socket_listener())
 
     def stop_socket(self, socket_name):
         if socket_name in self._socket_running:
             self._socket_running[socket_name] = False
+            socket = self._sockets.get(socket_name)
+            if socket is not None:
+                self._loop.call_soon_threadsafe(socket.wake)
 
     async def stop_client(self):
         await self._client.close_connection()
@@ -70,5 +97,5 @@ class ThreadedApiManager(threading.Thread):
             return
         self._running = False
         self._loop.call_soon(asyncio.create_task, self.stop_client())
-        for socket_name in self._socket_running.keys():
-            self._socket_running[socket_name] = False
+        for socket_name in list(self._socket_running):
+            self.stop_socket(socket_name)
@@ -0,0 +1,52 @@
+import threading
+import time
+from typing import Optional
+
+
+class TransportConfig:
+    """HTTP connection settings shared by ``Client`` and ``AsyncClient``.
+
+    ``idle_ping_interval`` keeps pooled sockets hot by issuing a cheap public
+    request whenever the client has been idle for that many seconds.
+    ``dns_cache_ttl`` applies to the aiohttp connector; the sync client avoids
+    repeat lookups by reusing its pooled connections.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keepalive: bool = True,
+        keepalive_timeout: float = 30,
+        idle_ping_interval: Optional[float] = None,
+        dns_cache_ttl: Optional[int] = 300,
+        warmup_connections: int = 1,
+        warmup_endpoint: str = "public/system_info",
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keepalive = keepalive
+        self.keepalive_timeout = keepalive_timeout
+        self.idle_ping_interval = idle_ping_interval
+        self.dns_cache_ttl = dns_cache_ttl
+        self.warmup_connections = warmup_connections
+        self.warmup_endpoint = warmup_endpoint
+
+
+class IdlePinger(threading.Thread):
+    def __init__(self, client, interval: float):
+        super().__init__(daemon=True, name="woox-idle-ping")
+        self._client = client
+        self._interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self._interval / 2):
+            idle = time.monotonic() - self._client._last_used
+            if idle >= self._interval:
+                self._client.warmup(connections=1)
+
+    def stop(self):
+        self._stop_event.set()